@@ -1,29 +1,71 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Query, Depends, Header
+from fastapi import FastAPI, APIRouter, HTTPException, Query, Depends, Header, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi.responses import ORJSONResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import AsyncMongoClient, InsertOne, ReturnDocument, UpdateOne, WriteConcern
+from pymongo.errors import DuplicateKeyError, OperationFailure
 import os
+import re
+import orjson
+import asyncio
 import logging
+import time
+from collections import OrderedDict
 from pathlib import Path
 from pydantic import BaseModel, Field, EmailStr
 from typing import List, Optional, Dict
 import uuid
+import base64
+import struct
+import hashlib
 from datetime import datetime, timedelta
-from bson import ObjectId
+from bson import ObjectId, encode as bson_encode
+from bson.raw_bson import RawBSONDocument
 from passlib.context import CryptContext
 from jose import JWTError, jwt
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
+# MongoDB connection (native asyncio PyMongo driver), opened on startup so
+# each worker process gets its own client bound to its running event loop
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ.get('DB_NAME', 'hardware_store')]
+db_name = os.environ.get('DB_NAME', 'hardware_store')
+client = None
+db = None
+
+# Connection pool settings: keep a warm minimum so requests after an idle
+# period skip the TCP/TLS/hello handshake, cap concurrent connection setup to
+# avoid connection storms, and fail fast when no server is reachable
+MONGO_CLIENT_OPTIONS = {
+    "maxPoolSize": 50,
+    "minPoolSize": 10,
+    "maxIdleTimeMS": 300000,
+    "maxConnecting": 4,
+    "serverSelectionTimeoutMS": 3000,
+}
+
+# Re-validate list responses against their models (debugging aid, off by default)
+VALIDATE_RESPONSES = os.getenv("VALIDATE_API_RESPONSE", "0") == "1"
 
 # Create the main app
-app = FastAPI(title="Belgian Hardware Store API")
+app = FastAPI(title="Belgian Hardware Store API", default_response_class=ORJSONResponse)
+
+# Comma-separated list of allowed browser origins, e.g. https://shop.example.be
+CORS_ORIGINS = [o.strip() for o in os.environ.get("FRONTEND_ORIGIN", "*").split(",") if o.strip()]
+
+# Register all middleware here, before any routes, so the ASGI middleware
+# stack is built once and never rebuilt at runtime
+app.add_middleware(
+    CORSMiddleware,
+    allow_credentials=True,
+    allow_origins=CORS_ORIGINS,
+    # Fixed sets keep the preflight checks to set lookups
+    allow_methods=frozenset({"GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"}),
+    allow_headers=frozenset({"authorization", "content-type", "accept"}),
+    max_age=86400,  # let browsers cache preflight responses for a day
+)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -100,9 +142,16 @@ async def require_superadmin(user = Depends(require_auth)):
 
 # ==================== MODELS ====================
 
-# Helper for ObjectId
+# Helper for document ids: a uuid4 as 22-char url-safe base64 instead of the
+# 36-char hex form (smaller documents, indexes and payloads). Existing 36-char
+# ids stay valid since ids are only ever compared as opaque strings.
 def str_id():
-    return str(uuid.uuid4())
+    return base64.urlsafe_b64encode(uuid.uuid4().bytes).rstrip(b"=").decode()
+
+def str_ids(n: int) -> List[str]:
+    """n ids in the str_id() format, drawn from a single os.urandom call"""
+    buf = os.urandom(16 * n)
+    return [base64.urlsafe_b64encode(buf[i:i + 16]).rstrip(b"=").decode() for i in range(0, 16 * n, 16)]
 
 # Multilingual Text Model
 class MultilingualText(BaseModel):
@@ -111,6 +160,12 @@ class MultilingualText(BaseModel):
     en: str = ""  # English
     tr: str = ""  # Turkish
 
+LANGUAGES = ("nl", "fr", "en", "tr")
+
+def i18n(*texts: str) -> dict:
+    """Multilingual text dict from texts given in LANGUAGES order"""
+    return dict(zip(LANGUAGES, texts))
+
 # User Models
 class UserRegister(BaseModel):
     email: str
@@ -316,6 +371,118 @@ class DashboardStats(BaseModel):
     recent_orders: List[dict] = []
     top_products: List[dict] = []
 
+# ==================== CACHING ====================
+
+class TTLCache:
+    """Small in-process LRU cache whose entries expire after `ttl` seconds"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+
+    def get(self, key):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key, value):
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def invalidate(self, key):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+# Category lists keyed by (active_only, fields); cleared on every category write
+category_list_cache = TTLCache(maxsize=8, ttl=30)
+
+# Single-document lookups keyed by the id in the request path; short TTL since
+# other workers' writes only become visible once an entry expires
+product_cache = TTLCache(maxsize=1024, ttl=5)
+category_cache = TTLCache(maxsize=1024, ttl=5)
+order_cache = TTLCache(maxsize=1024, ttl=5)
+
+def invalidate_order(order: dict):
+    """Drop an order from the cache under both of its lookup keys"""
+    order_cache.invalidate(order.get("id"))
+    order_cache.invalidate(order.get("order_number"))
+
+# ==================== DASHBOARD STATS ====================
+
+# Dashboard counters are materialized in a single stats document and kept up
+# to date with $inc on every write that affects them, so the dashboard does
+# not have to count whole collections on each request. Changes made outside
+# the API can be folded in with POST /admin/stats/recompute.
+#
+# A rebuild counts the collections and then replaces the document. Counter
+# updates landing between those two steps are lost (or, for a write counted
+# just before its $inc, applied twice), so rebuild only while writes are quiet.
+STATS_ID = "dashboard"
+
+REVENUE_PIPELINE = [
+    {"$match": {"payment_status": "paid"}},
+    {"$group": {"_id": None, "total": {"$sum": "$total"}}}
+]
+
+async def aggregate_to_list(collection, pipeline, length):
+    cursor = await collection.aggregate(pipeline)
+    return await cursor.to_list(length)
+
+async def recompute_stats():
+    """Rebuild the materialized dashboard counters from the collections.
+
+    Not atomic with concurrent bump_stats() calls; see the note above.
+    """
+    total_products, total_orders, total_customers, pending_orders, revenue_result = await asyncio.gather(
+        db.products.count_documents({}),
+        db.orders.count_documents({}),
+        db.customers.count_documents({}),
+        db.orders.count_documents({"status": "pending"}),
+        aggregate_to_list(db.orders, REVENUE_PIPELINE, 1),
+    )
+    stats = {
+        "total_products": total_products,
+        "total_orders": total_orders,
+        "total_customers": total_customers,
+        "pending_orders": pending_orders,
+        "total_revenue": revenue_result[0]["total"] if revenue_result else 0,
+    }
+    await db.stats.replace_one({"_id": STATS_ID}, stats, upsert=True)
+    return stats
+
+async def get_stats():
+    stats = await db.stats.find_one({"_id": STATS_ID})
+    if stats is None:
+        stats = await recompute_stats()
+    return stats
+
+async def bump_stats(**deltas):
+    """Apply counter deltas; a missing stats document is rebuilt on next read"""
+    deltas = {k: v for k, v in deltas.items() if v}
+    if deltas:
+        await db.stats.update_one({"_id": STATS_ID}, {"$inc": deltas})
+
+def order_stats_deltas(before: dict, status: Optional[str] = None, payment_status: Optional[str] = None) -> dict:
+    """Counter deltas for moving an order from `before` to a new status/payment status"""
+    deltas = {}
+    if status is not None:
+        deltas["pending_orders"] = (status == "pending") - (before.get("status") == "pending")
+    if payment_status is not None:
+        was_paid = before.get("payment_status") == "paid"
+        deltas["total_revenue"] = before.get("total", 0) * ((payment_status == "paid") - was_paid)
+    return deltas
+
 # ==================== AUTH ENDPOINTS ====================
 
 @api_router.post("/auth/register")
@@ -332,10 +499,13 @@ async def register(user_data: UserRegister):
         phone=user_data.phone,
         role="user"
     )
-    user_dict = user.dict()
+    user_dict = user.model_dump()
     user_dict["password_hash"] = get_password_hash(user_data.password)
     
-    await db.users.insert_one(user_dict)
+    try:
+        await db.users.insert_one(user_dict)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Email already registered")
     
     # Create access token
     access_token = create_access_token(
@@ -395,7 +565,7 @@ async def get_me(user = Depends(require_auth)):
 
 @api_router.put("/auth/profile")
 async def update_profile(profile: UserUpdate, user = Depends(require_auth)):
-    update_data = {k: v for k, v in profile.dict().items() if v is not None}
+    update_data = profile.model_dump(exclude_none=True)
     if update_data:
         await db.users.update_one({"id": user["id"]}, {"$set": update_data})
     updated_user = await db.users.find_one({"id": user["id"]})
@@ -418,14 +588,14 @@ async def get_site_settings():
     if not settings:
         # Return default settings
         default = SiteSettings()
-        return default.dict()
+        return default.model_dump()
     # Remove MongoDB _id field
     settings.pop("_id", None)
     return settings
 
 @api_router.put("/settings")
 async def update_site_settings(settings: SiteSettingsUpdate, user = Depends(require_superadmin)):
-    update_data = {k: v for k, v in settings.dict().items() if v is not None}
+    update_data = settings.model_dump(exclude_none=True)
     update_data["updated_at"] = datetime.utcnow()
     
     existing = await db.settings.find_one({"id": "site_settings"})
@@ -433,7 +603,7 @@ async def update_site_settings(settings: SiteSettingsUpdate, user = Depends(requ
         await db.settings.update_one({"id": "site_settings"}, {"$set": update_data})
     else:
         new_settings = SiteSettings(**update_data)
-        await db.settings.insert_one(new_settings.dict())
+        await db.settings.insert_one(new_settings.model_dump())
     
     result = await db.settings.find_one({"id": "site_settings"})
     # Remove MongoDB _id field
@@ -516,24 +686,57 @@ async def toggle_user_status(user_id: str, admin = Depends(require_admin)):
 
 # ==================== CATEGORY ENDPOINTS ====================
 
-@api_router.get("/categories", response_model=List[Category])
-async def get_categories(active_only: bool = False):
-    query = {"is_active": True} if active_only else {}
-    categories = await db.categories.find(query).sort("sort_order", 1).to_list(100)
-    return [Category(**{**cat, "id": cat.get("id")}) for cat in categories]
-
-@api_router.get("/categories/{category_id}", response_model=Category)
+# Default projections for list views: skip fields that only detail views use.
+# Product images are stored inline as base64, so lists keep just the first one
+# as a thumbnail; the full set is served by /products/{id}/images.
+PRODUCT_LIST_PROJECTION = {"_id": 0, "images": {"$slice": 1}, "description": 0, "specifications": 0, "search_terms": 0}
+CATEGORY_LIST_PROJECTION = {"_id": 0, "image": 0}
+
+# Fields a list request may select with `fields`; names outside the model
+# (such as _id or dotted sub-paths) are ignored
+PRODUCT_FIELDS = frozenset(Product.model_fields)
+CATEGORY_FIELDS = frozenset(Category.model_fields)
+
+def list_projection(fields: Optional[str], default: dict, allowed: frozenset) -> dict:
+    """Build a find() projection from a comma-separated `fields` query param"""
+    if not fields:
+        return default
+    projection = {"_id": 0, "id": 1}
+    projection.update({name: 1 for name in (f.strip() for f in fields.split(",")) if name in allowed})
+    return projection
+
+# Trust boundary: request bodies (POST/PUT) are validated by their models;
+# documents read back from Mongo were validated on the way in, so GET routes
+# return them as stored instead of rebuilding a model per document and then
+# having FastAPI re-validate it against response_model. Set
+# VALIDATE_API_RESPONSE=1 to turn response validation back on.
+@api_router.get("/categories", response_model=List[Category] if VALIDATE_RESPONSES else None)
+async def get_categories(active_only: bool = False, fields: Optional[str] = None):
+    cache_key = (active_only, fields)
+    categories = category_list_cache.get(cache_key)
+    if categories is None:
+        query = {"is_active": True} if active_only else {}
+        projection = list_projection(fields, CATEGORY_LIST_PROJECTION, CATEGORY_FIELDS)
+        categories = await db.categories.find(query, projection).sort("sort_order", 1).to_list(100)
+        category_list_cache.set(cache_key, categories)
+    return categories
+
+@api_router.get("/categories/{category_id}", response_model=Category if VALIDATE_RESPONSES else None)
 async def get_category(category_id: str):
-    category = await db.categories.find_one({"id": category_id})
-    if not category:
-        raise HTTPException(status_code=404, detail="Category not found")
-    return Category(**{**category, "id": category.get("id")})
+    category = category_cache.get(category_id)
+    if category is None:
+        category = await db.categories.find_one({"id": category_id}, {"_id": 0})
+        if not category:
+            raise HTTPException(status_code=404, detail="Category not found")
+        category_cache.set(category_id, category)
+    return category
 
 @api_router.post("/categories", response_model=Category)
 async def create_category(category: CategoryCreate, user = Depends(require_admin)):
-    category_dict = category.dict()
+    category_dict = category.model_dump()
     category_obj = Category(**category_dict)
-    await db.categories.insert_one(category_obj.dict())
+    await db.categories.insert_one(category_obj.model_dump())
+    category_list_cache.clear()
     return category_obj
 
 
@@ -543,9 +746,11 @@ async def update_category(category_id: str, category: CategoryCreate):
     if not existing:
         raise HTTPException(status_code=404, detail="Category not found")
     
-    update_data = category.dict()
+    update_data = category.model_dump()
     update_data["updated_at"] = datetime.utcnow()
     await db.categories.update_one({"id": category_id}, {"$set": update_data})
+    category_list_cache.clear()
+    category_cache.invalidate(category_id)
     
     updated = await db.categories.find_one({"id": category_id})
     return Category(**updated)
@@ -555,17 +760,47 @@ async def delete_category(category_id: str):
     result = await db.categories.delete_one({"id": category_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Category not found")
+    category_list_cache.clear()
+    category_cache.invalidate(category_id)
     return {"message": "Category deleted successfully"}
 
 # ==================== PRODUCT ENDPOINTS ====================
 
-@api_router.get("/products", response_model=List[Product])
+SEARCH_TERM_RE = re.compile(r"\w+")
+
+def product_search_terms(product: dict) -> List[str]:
+    """Lowercased words of the product's names, SKU and brand, for prefix search"""
+    sku = product.get("sku", "").lower()
+    text = " ".join([*product.get("name", {}).values(), sku, product.get("brand", "")]).lower()
+    terms = set(SEARCH_TERM_RE.findall(text))
+    if sku:
+        terms.add(sku)
+    return sorted(terms)
+
+def product_search_query(search: str) -> dict:
+    """Filter for the products list `search` param"""
+    term = search.strip().lower()
+    if not term or len(term.split()) > 1:
+        return {"$text": {"$search": search}}
+    
+    # Single word or SKU: anchored prefix match on the indexed search_terms array
+    whole = {"search_terms": {"$regex": f"^{re.escape(term)}"}}
+    tokens = SEARCH_TERM_RE.findall(term)
+    if tokens and tokens != [term]:
+        # Punctuated input ("12-piece") is stored as separate word terms;
+        # match it whole (SKUs) or as a prefix of every one of its words
+        words = [{"search_terms": {"$regex": f"^{re.escape(token)}"}} for token in tokens]
+        return {"$or": [whole, {"$and": words}]}
+    return whole
+
+@api_router.get("/products", response_model=List[Product] if VALIDATE_RESPONSES else None)
 async def get_products(
     category_id: Optional[str] = None,
     search: Optional[str] = None,
     active_only: bool = False,
     skip: int = 0,
-    limit: int = 50
+    limit: int = Query(50, ge=1),
+    fields: Optional[str] = None
 ):
     query = {}
     if category_id:
@@ -573,30 +808,39 @@ async def get_products(
     if active_only:
         query["is_active"] = True
     if search:
-        query["$or"] = [
-            {"name.nl": {"$regex": search, "$options": "i"}},
-            {"name.fr": {"$regex": search, "$options": "i"}},
-            {"name.en": {"$regex": search, "$options": "i"}},
-            {"name.tr": {"$regex": search, "$options": "i"}},
-            {"sku": {"$regex": search, "$options": "i"}},
-            {"brand": {"$regex": search, "$options": "i"}}
-        ]
+        query.update(product_search_query(search))
     
-    products = await db.products.find(query).skip(skip).limit(limit).to_list(limit)
-    return [Product(**{**prod, "id": prod.get("id")}) for prod in products]
+    projection = list_projection(fields, PRODUCT_LIST_PROJECTION, PRODUCT_FIELDS)
+    return await db.products.find(query, projection).skip(skip).limit(limit).to_list(limit)
 
-@api_router.get("/products/{product_id}", response_model=Product)
+@api_router.get("/products/{product_id}", response_model=Product if VALIDATE_RESPONSES else None)
 async def get_product(product_id: str):
-    product = await db.products.find_one({"id": product_id})
+    product = product_cache.get(product_id)
+    if product is None:
+        product = await db.products.find_one({"id": product_id}, {"_id": 0, "search_terms": 0})
+        if not product:
+            raise HTTPException(status_code=404, detail="Product not found")
+        product_cache.set(product_id, product)
+    return product
+
+@api_router.get("/products/{product_id}/images")
+async def get_product_images(product_id: str):
+    product = await db.products.find_one({"id": product_id}, {"_id": 0, "images": 1})
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
-    return Product(**product)
+    return {"images": product.get("images", [])}
 
 @api_router.post("/products", response_model=Product)
 async def create_product(product: ProductCreate):
-    product_dict = product.dict()
+    product_dict = product.model_dump()
     product_obj = Product(**product_dict)
-    await db.products.insert_one(product_obj.dict())
+    product_doc = product_obj.model_dump()
+    product_doc["search_terms"] = product_search_terms(product_doc)
+    try:
+        await db.products.insert_one(product_doc)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="SKU already exists")
+    await bump_stats(total_products=1)
     return product_obj
 
 @api_router.put("/products/{product_id}", response_model=Product)
@@ -605,9 +849,15 @@ async def update_product(product_id: str, product: ProductUpdate):
     if not existing:
         raise HTTPException(status_code=404, detail="Product not found")
     
-    update_data = {k: v for k, v in product.dict().items() if v is not None}
+    update_data = product.model_dump(exclude_none=True)
     update_data["updated_at"] = datetime.utcnow()
-    await db.products.update_one({"id": product_id}, {"$set": update_data})
+    if {"name", "sku", "brand"} & update_data.keys():
+        update_data["search_terms"] = product_search_terms({**existing, **update_data})
+    try:
+        await db.products.update_one({"id": product_id}, {"$set": update_data})
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="SKU already exists")
+    product_cache.invalidate(product_id)
     
     updated = await db.products.find_one({"id": product_id})
     return Product(**updated)
@@ -627,6 +877,7 @@ async def update_stock(product_id: str, quantity: int):
         {"id": product_id},
         {"$set": {"stock": new_stock, "updated_at": datetime.utcnow()}}
     )
+    product_cache.invalidate(product_id)
     return {"message": "Stock updated", "new_stock": new_stock}
 
 @api_router.delete("/products/{product_id}")
@@ -634,6 +885,8 @@ async def delete_product(product_id: str):
     result = await db.products.delete_one({"id": product_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Product not found")
+    product_cache.invalidate(product_id)
+    await bump_stats(total_products=-1)
     return {"message": "Product deleted successfully"}
 
 # ==================== ORDER ENDPOINTS ====================
@@ -647,8 +900,18 @@ async def create_order(order_data: OrderCreate):
     order_items = []
     subtotal = 0
     
+    # Fetch all ordered products in a single round trip (none for an empty cart;
+    # the driver's to_list rejects a length of 0)
+    product_ids = list({item.product_id for item in order_data.items})
+    products = {}
+    if product_ids:
+        products = {
+            p["id"]: p
+            for p in await db.products.find({"id": {"$in": product_ids}}).to_list(len(product_ids))
+        }
+    
     for item in order_data.items:
-        product = await db.products.find_one({"id": item.product_id})
+        product = products.get(item.product_id)
         if not product:
             raise HTTPException(status_code=404, detail=f"Product {item.product_id} not found")
         if product.get("stock", 0) < item.quantity:
@@ -657,7 +920,7 @@ async def create_order(order_data: OrderCreate):
         item_total = product["price"] * item.quantity
         order_items.append(OrderItem(
             product_id=item.product_id,
-            product_name=MultilingualText(**product.get("name", {})),
+            product_name=product.get("name", {}),
             quantity=item.quantity,
             price=product["price"],
             total=item_total
@@ -682,68 +945,71 @@ async def create_order(order_data: OrderCreate):
         payment_status="pending"
     )
     
-    await db.orders.insert_one(order.dict())
+    await db.orders.insert_one(order.model_dump())
     
-    # Update stock for each product
-    for item in order_data.items:
-        await db.products.update_one(
-            {"id": item.product_id},
-            {"$inc": {"stock": -item.quantity}, "$set": {"updated_at": datetime.utcnow()}}
-        )
+    # Update stock for all products in one batch
+    now = datetime.utcnow()
+    stock_updates = [
+        UpdateOne({"id": item.product_id}, {"$inc": {"stock": -item.quantity}, "$set": {"updated_at": now}})
+        for item in order_data.items
+    ]
+    if stock_updates:
+        await db.products.bulk_write(stock_updates, ordered=False)
+    for product_id in product_ids:
+        product_cache.invalidate(product_id)
     
-    # Update or create customer record
-    existing_customer = await db.customers.find_one({"email": order_data.customer.email})
-    if existing_customer:
-        await db.customers.update_one(
-            {"email": order_data.customer.email},
-            {
-                "$inc": {"total_orders": 1, "total_spent": total},
-                "$set": {
-                    "name": order_data.customer.name,
-                    "phone": order_data.customer.phone,
-                    "address": order_data.customer.address,
-                    "city": order_data.customer.city,
-                    "postal_code": order_data.customer.postal_code
-                }
-            }
-        )
-    else:
-        customer = Customer(
-            name=order_data.customer.name,
-            email=order_data.customer.email,
-            phone=order_data.customer.phone,
-            address=order_data.customer.address,
-            city=order_data.customer.city,
-            postal_code=order_data.customer.postal_code,
-            total_orders=1,
-            total_spent=total
-        )
-        await db.customers.insert_one(customer.dict())
+    # Update or create customer record in one upsert, so concurrent first
+    # orders from the same email cannot collide on the unique email index
+    contact = {
+        "name": order_data.customer.name,
+        "phone": order_data.customer.phone,
+        "address": order_data.customer.address,
+        "city": order_data.customer.city,
+        "postal_code": order_data.customer.postal_code
+    }
+    # Remaining Customer fields (id, country, created_at) are only set on insert
+    new_fields = Customer(email=order_data.customer.email, **contact).model_dump(
+        exclude={"email", "total_orders", "total_spent", *contact}
+    )
+    result = await db.customers.update_one(
+        {"email": order_data.customer.email},
+        {
+            "$inc": {"total_orders": 1, "total_spent": total},
+            "$set": contact,
+            "$setOnInsert": new_fields
+        },
+        upsert=True
+    )
+    new_customer = result.upserted_id is not None
+    
+    await bump_stats(total_orders=1, pending_orders=1, total_customers=int(new_customer))
     
     return order
 
-@api_router.get("/orders", response_model=List[Order])
+@api_router.get("/orders", response_model=List[Order] if VALIDATE_RESPONSES else None)
 async def get_orders(
     status: Optional[str] = None,
     skip: int = 0,
-    limit: int = 50
+    limit: int = Query(50, ge=1)
 ):
     query = {}
     if status:
         query["status"] = status
     
-    orders = await db.orders.find(query).sort("created_at", -1).skip(skip).limit(limit).to_list(limit)
-    return [Order(**order) for order in orders]
+    return await db.orders.find(query, {"_id": 0}).sort("created_at", -1).skip(skip).limit(limit).to_list(limit)
 
-@api_router.get("/orders/{order_id}", response_model=Order)
+@api_router.get("/orders/{order_id}", response_model=Order if VALIDATE_RESPONSES else None)
 async def get_order(order_id: str):
-    order = await db.orders.find_one({"id": order_id})
-    if not order:
-        # Try by order_number
-        order = await db.orders.find_one({"order_number": order_id})
-    if not order:
-        raise HTTPException(status_code=404, detail="Order not found")
-    return Order(**order)
+    order = order_cache.get(order_id)
+    if order is None:
+        order = await db.orders.find_one({"id": order_id}, {"_id": 0})
+        if not order:
+            # Try by order_number
+            order = await db.orders.find_one({"order_number": order_id}, {"_id": 0})
+        if not order:
+            raise HTTPException(status_code=404, detail="Order not found")
+        order_cache.set(order_id, order)
+    return order
 
 @api_router.patch("/orders/{order_id}/status")
 async def update_order_status(order_id: str, status: str):
@@ -751,22 +1017,30 @@ async def update_order_status(order_id: str, status: str):
     if status not in valid_statuses:
         raise HTTPException(status_code=400, detail=f"Invalid status. Must be one of: {valid_statuses}")
     
-    order = await db.orders.find_one({"id": order_id})
-    if not order:
+    # Stats deltas and the stock restore are based on the order as this update
+    # found it, so concurrent status changes cannot apply them twice
+    order = await db.orders.find_one_and_update(
+        {"id": order_id},
+        {"$set": {"status": status, "updated_at": datetime.utcnow()}},
+        projection={"_id": 0, "id": 1, "order_number": 1, "status": 1, "items": 1},
+        return_document=ReturnDocument.BEFORE
+    )
+    if order is None:
         raise HTTPException(status_code=404, detail="Order not found")
     
     # If cancelling, restore stock
     if status == "cancelled" and order.get("status") != "cancelled":
+        stock_updates = [
+            UpdateOne({"id": item["product_id"]}, {"$inc": {"stock": item["quantity"]}})
+            for item in order.get("items", [])
+        ]
+        if stock_updates:
+            await db.products.bulk_write(stock_updates, ordered=False)
         for item in order.get("items", []):
-            await db.products.update_one(
-                {"id": item["product_id"]},
-                {"$inc": {"stock": item["quantity"]}}
-            )
+            product_cache.invalidate(item["product_id"])
     
-    await db.orders.update_one(
-        {"id": order_id},
-        {"$set": {"status": status, "updated_at": datetime.utcnow()}}
-    )
+    invalidate_order(order)
+    await bump_stats(**order_stats_deltas(order, status=status))
     return {"message": f"Order status updated to {status}"}
 
 @api_router.patch("/orders/{order_id}/payment")
@@ -775,21 +1049,24 @@ async def update_payment_status(order_id: str, payment_status: str):
     if payment_status not in valid_statuses:
         raise HTTPException(status_code=400, detail=f"Invalid payment status. Must be one of: {valid_statuses}")
     
-    result = await db.orders.update_one(
+    before = await db.orders.find_one_and_update(
         {"id": order_id},
-        {"$set": {"payment_status": payment_status, "updated_at": datetime.utcnow()}}
+        {"$set": {"payment_status": payment_status, "updated_at": datetime.utcnow()}},
+        projection={"_id": 0, "id": 1, "order_number": 1, "payment_status": 1, "total": 1},
+        return_document=ReturnDocument.BEFORE
     )
-    if result.matched_count == 0:
+    if before is None:
         raise HTTPException(status_code=404, detail="Order not found")
+    invalidate_order(before)
+    await bump_stats(**order_stats_deltas(before, payment_status=payment_status))
     return {"message": f"Payment status updated to {payment_status}"}
 
 # ==================== DISCOUNT ENDPOINTS ====================
 
-@api_router.get("/discounts", response_model=List[Discount])
+@api_router.get("/discounts", response_model=List[Discount] if VALIDATE_RESPONSES else None)
 async def get_discounts(active_only: bool = False):
     query = {"is_active": True} if active_only else {}
-    discounts = await db.discounts.find(query).to_list(100)
-    return [Discount(**discount) for discount in discounts]
+    return await db.discounts.find(query, {"_id": 0}).to_list(100)
 
 @api_router.post("/discounts", response_model=Discount)
 async def create_discount(discount: DiscountCreate):
@@ -798,15 +1075,18 @@ async def create_discount(discount: DiscountCreate):
     if existing:
         raise HTTPException(status_code=400, detail="Discount code already exists")
     
-    discount_dict = discount.dict()
+    discount_dict = discount.model_dump()
     discount_dict["code"] = discount_dict["code"].upper()
     discount_obj = Discount(**discount_dict)
-    await db.discounts.insert_one(discount_obj.dict())
+    try:
+        await db.discounts.insert_one(discount_obj.model_dump())
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Discount code already exists")
     return discount_obj
 
-@api_router.get("/discounts/validate/{code}")
+@api_router.get("/discounts/validate/{code}", response_model=Discount if VALIDATE_RESPONSES else None)
 async def validate_discount(code: str, order_amount: float = 0):
-    discount = await db.discounts.find_one({"code": code.upper(), "is_active": True})
+    discount = await db.discounts.find_one({"code": code.upper(), "is_active": True}, {"_id": 0})
     if not discount:
         raise HTTPException(status_code=404, detail="Invalid discount code")
     
@@ -820,7 +1100,28 @@ async def validate_discount(code: str, order_amount: float = 0):
     if order_amount < discount.get("min_order_amount", 0):
         raise HTTPException(status_code=400, detail=f"Minimum order amount is €{discount['min_order_amount']}")
     
-    return Discount(**discount)
+    return discount
+
+@api_router.post("/discounts/redeem/{code}", response_model=Discount if VALIDATE_RESPONSES else None)
+async def redeem_discount(code: str, order_amount: float = 0):
+    """Check a discount code and count one use of it in a single atomic update"""
+    discount = await db.discounts.find_one_and_update(
+        {
+            "code": code.upper(),
+            "is_active": True,
+            "min_order_amount": {"$lte": order_amount},
+            "$and": [
+                {"$or": [{"valid_until": None}, {"valid_until": {"$gte": datetime.utcnow()}}]},
+                {"$or": [{"max_uses": 0}, {"$expr": {"$lt": ["$used_count", "$max_uses"]}}]}
+            ]
+        },
+        {"$inc": {"used_count": 1}},
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER
+    )
+    if discount is None:
+        raise HTTPException(status_code=400, detail="Discount code is invalid, expired or no longer available")
+    return discount
 
 @api_router.delete("/discounts/{discount_id}")
 async def delete_discount(discount_id: str):
@@ -831,78 +1132,65 @@ async def delete_discount(discount_id: str):
 
 # ==================== CUSTOMER ENDPOINTS (ADMIN) ====================
 
-@api_router.get("/customers", response_model=List[Customer])
-async def get_customers(skip: int = 0, limit: int = 50):
-    customers = await db.customers.find().sort("created_at", -1).skip(skip).limit(limit).to_list(limit)
-    return [Customer(**customer) for customer in customers]
+@api_router.get("/customers", response_model=List[Customer] if VALIDATE_RESPONSES else None)
+async def get_customers(skip: int = 0, limit: int = Query(50, ge=1)):
+    return await db.customers.find({}, {"_id": 0}).sort("created_at", -1).skip(skip).limit(limit).to_list(limit)
 
-@api_router.get("/customers/{customer_id}", response_model=Customer)
+@api_router.get("/customers/{customer_id}", response_model=Customer if VALIDATE_RESPONSES else None)
 async def get_customer(customer_id: str):
-    customer = await db.customers.find_one({"id": customer_id})
+    customer = await db.customers.find_one({"id": customer_id}, {"_id": 0})
     if not customer:
-        customer = await db.customers.find_one({"email": customer_id})
+        customer = await db.customers.find_one({"email": customer_id}, {"_id": 0})
     if not customer:
         raise HTTPException(status_code=404, detail="Customer not found")
-    return Customer(**customer)
+    return customer
 
 # ==================== ADMIN DASHBOARD ====================
 
 @api_router.get("/admin/dashboard", response_model=DashboardStats)
 async def get_dashboard_stats():
-    # Total counts
-    total_products = await db.products.count_documents({})
-    total_orders = await db.orders.count_documents({})
-    total_customers = await db.customers.count_documents({})
-    pending_orders = await db.orders.count_documents({"status": "pending"})
-    low_stock_products = await db.products.count_documents({"stock": {"$lt": 10}})
-    
-    # Total revenue
-    pipeline = [
-        {"$match": {"payment_status": "paid"}},
-        {"$group": {"_id": None, "total": {"$sum": "$total"}}}
-    ]
-    revenue_result = await db.orders.aggregate(pipeline).to_list(1)
-    total_revenue = revenue_result[0]["total"] if revenue_result else 0
-    
-    # Recent orders
-    recent_orders = await db.orders.find().sort("created_at", -1).limit(5).to_list(5)
-    
-    # Top products by order count
+    # Top products by order count, joined with their product names
     top_pipeline = [
         {"$unwind": "$items"},
         {"$group": {"_id": "$items.product_id", "count": {"$sum": "$items.quantity"}}},
         {"$sort": {"count": -1}},
-        {"$limit": 5}
+        {"$limit": 5},
+        {"$lookup": {"from": "products", "localField": "_id", "foreignField": "id", "as": "product"}},
+        {"$unwind": "$product"},
+        {"$project": {"_id": 0, "id": "$_id", "name": {"$ifNull": ["$product.name", {}]}, "sold": "$count"}}
     ]
-    top_products_result = await db.orders.aggregate(top_pipeline).to_list(5)
     
-    top_products = []
-    for item in top_products_result:
-        product = await db.products.find_one({"id": item["_id"]})
-        if product:
-            top_products.append({
-                "id": item["_id"],
-                "name": product.get("name", {}),
-                "sold": item["count"]
-            })
+    # Totals come from the materialized stats; the rest are independent
+    # queries, so run them concurrently
+    stats, low_stock_products, recent_orders, top_products = await asyncio.gather(
+        get_stats(),
+        db.products.count_documents({"stock": {"$lt": 10}}),
+        db.orders.find().sort("created_at", -1).limit(5).to_list(5),
+        aggregate_to_list(db.orders, top_pipeline, 5),
+    )
     
     return DashboardStats(
-        total_products=total_products,
-        total_orders=total_orders,
-        total_revenue=round(total_revenue, 2),
-        total_customers=total_customers,
-        pending_orders=pending_orders,
+        total_products=stats.get("total_products", 0),
+        total_orders=stats.get("total_orders", 0),
+        total_revenue=round(stats.get("total_revenue", 0), 2),
+        total_customers=stats.get("total_customers", 0),
+        pending_orders=stats.get("pending_orders", 0),
         low_stock_products=low_stock_products,
         recent_orders=[{
             "id": o.get("id"),
             "order_number": o.get("order_number"),
             "total": o.get("total"),
             "status": o.get("status"),
-            "created_at": o.get("created_at").isoformat() if o.get("created_at") else None
+            "created_at": o.get("created_at")
         } for o in recent_orders],
         top_products=top_products
     )
 
+@api_router.post("/admin/stats/recompute")
+async def recompute_dashboard_stats():
+    """Rebuild the dashboard counters from the collections; run while writes are quiet"""
+    return await recompute_stats()
+
 @api_router.get("/admin/reports/sales")
 async def get_sales_report(
     start_date: Optional[str] = None,
@@ -929,7 +1217,6 @@ async def get_sales_report(
         },
         {"$sort": {"_id": 1}}
     ]
-    daily_sales = await db.orders.aggregate(pipeline).to_list(100)
     
     # Category sales
     cat_pipeline = [
@@ -943,7 +1230,11 @@ async def get_sales_report(
             }
         }
     ]
-    product_sales = await db.orders.aggregate(cat_pipeline).to_list(100)
+    
+    daily_sales, product_sales = await asyncio.gather(
+        aggregate_to_list(db.orders, pipeline, 100),
+        aggregate_to_list(db.orders, cat_pipeline, 100),
+    )
     
     return {
         "daily_sales": daily_sales,
@@ -955,29 +1246,198 @@ async def get_sales_report(
 @api_router.post("/payment/mock")
 async def process_mock_payment(order_id: str, success: bool = True):
     """Mock payment processor for testing"""
-    order = await db.orders.find_one({"id": order_id})
-    if not order:
+    if success:
+        update = {"payment_status": "paid", "status": "confirmed", "updated_at": datetime.utcnow()}
+    else:
+        update = {"payment_status": "failed", "updated_at": datetime.utcnow()}
+    
+    # Deltas come from the order as this update found it, so a repeated
+    # payment does not count the same revenue twice
+    order = await db.orders.find_one_and_update(
+        {"id": order_id},
+        {"$set": update},
+        projection={"_id": 0, "id": 1, "order_number": 1, "status": 1, "payment_status": 1, "total": 1},
+        return_document=ReturnDocument.BEFORE
+    )
+    if order is None:
         raise HTTPException(status_code=404, detail="Order not found")
+    invalidate_order(order)
+    await bump_stats(**order_stats_deltas(order, status=update.get("status"), payment_status=update["payment_status"]))
     
     if success:
-        await db.orders.update_one(
-            {"id": order_id},
-            {"$set": {
-                "payment_status": "paid",
-                "status": "confirmed",
-                "updated_at": datetime.utcnow()
-            }}
-        )
         return {"success": True, "message": "Payment successful", "transaction_id": f"MOCK-{uuid.uuid4()}"}
-    else:
-        await db.orders.update_one(
-            {"id": order_id},
-            {"$set": {"payment_status": "failed", "updated_at": datetime.utcnow()}}
-        )
-        return {"success": False, "message": "Payment failed"}
+    return {"success": False, "message": "Payment failed"}
 
 # ==================== SEED DATA ====================
 
+# Seed data is reproducible sample data, so its inserts are acknowledged by
+# the primary without waiting for the journal
+SEED_WRITE_CONCERN = WriteConcern(w=1, j=False)
+
+# Sample catalog for /seed, built once at import. Templates carry no ids or
+# timestamps; seed_database shallow-copies them per call, so their nested
+# dicts are shared between calls and must never be mutated.
+SEED_CATEGORIES = [
+    {
+        "name": i18n("Handgereedschap", "Outils à main", "Hand Tools", "El Aletleri"),
+        "description": i18n("Alle handgereedschappen", "Tous les outils à main", "All hand tools", "Tüm el aletleri"),
+        "sort_order": 1
+    },
+    {
+        "name": i18n("Elektrisch gereedschap", "Outils électriques", "Power Tools", "Elektrikli Aletler"),
+        "description": i18n("Elektrisch gereedschap", "Outils électriques", "Power tools", "Elektrikli aletler"),
+        "sort_order": 2
+    },
+    {
+        "name": i18n("Verf & Accessoires", "Peinture & Accessoires", "Paint & Accessories", "Boya & Aksesuarlar"),
+        "description": i18n("Verf en schilderbenodigdheden", "Peinture et fournitures de peinture", "Paint and painting supplies", "Boya ve boya malzemeleri"),
+        "sort_order": 3
+    },
+    {
+        "name": i18n("Bevestigingsmaterialen", "Fixations", "Fasteners", "Bağlantı Elemanları"),
+        "description": i18n("Schroeven, bouten en moeren", "Vis, boulons et écrous", "Screws, bolts and nuts", "Vidalar, cıvatalar ve somunlar"),
+        "sort_order": 4
+    },
+    {
+        "name": i18n("Sanitair", "Plomberie", "Plumbing", "Sıhhi Tesisat"),
+        "description": i18n("Sanitaire artikelen", "Articles de plomberie", "Plumbing supplies", "Sıhhi tesisat malzemeleri"),
+        "sort_order": 5
+    },
+    {
+        "name": i18n("Elektriciteit", "Électricité", "Electrical", "Elektrik"),
+        "description": i18n("Elektrische artikelen", "Articles électriques", "Electrical supplies", "Elektrik malzemeleri"),
+        "sort_order": 6
+    }
+]
+
+# Sample product rows: index into SEED_CATEGORIES, then SEED_PRODUCT_KEYS values
+SEED_PRODUCT_KEYS = ("name", "description", "price", "stock", "sku", "unit", "brand", "specifications")
+SEED_PRODUCT_ROWS = [
+    (
+        0,
+        i18n("Professionele Hamer", "Marteau professionnel", "Professional Hammer", "Profesyonel Çekiç"),
+        i18n("Hoogwaardige stalen hamer", "Marteau en acier de haute qualité", "High quality steel hammer", "Yüksek kaliteli çelik çekiç"),
+        24.99, 50, "HT-001", "piece", "Stanley",
+        {"weight": "500g", "material": "Steel"}
+    ),
+    (
+        0,
+        i18n("Schroevendraaierset 12-delig", "Jeu de tournevis 12 pièces", "Screwdriver Set 12-piece", "12 Parça Tornavida Seti"),
+        i18n("Complete set schroevendraaiers", "Jeu complet de tournevis", "Complete set of screwdrivers", "Komple tornavida seti"),
+        34.99, 30, "HT-002", "set", "Bosch",
+        {"pieces": "12", "type": "Various"}
+    ),
+    (
+        1,
+        i18n("Accuboormachine 18V", "Perceuse sans fil 18V", "Cordless Drill 18V", "Akülü Matkap 18V"),
+        i18n("Krachtige accuboormachine", "Perceuse sans fil puissante", "Powerful cordless drill", "Güçlü akülü matkap"),
+        129.99, 15, "PT-001", "piece", "DeWalt",
+        {"voltage": "18V", "battery": "2.0Ah"}
+    ),
+    (
+        2,
+        i18n("Muurverf Wit 10L", "Peinture murale blanche 10L", "Wall Paint White 10L", "Duvar Boyası Beyaz 10L"),
+        i18n("Witte muurverf voor binnen", "Peinture murale blanche pour intérieur", "White wall paint for interior", "İç mekan için beyaz duvar boyası"),
+        49.99, 25, "PA-001", "bucket", "Levis",
+        {"volume": "10L", "coverage": "80m²"}
+    ),
+    (
+        3,
+        i18n("Schroeven Assortiment", "Assortiment de vis", "Screw Assortment", "Vida Çeşitleri"),
+        i18n("500 schroeven in diverse maten", "500 vis de différentes tailles", "500 screws in various sizes", "Çeşitli boyutlarda 500 vida"),
+        19.99, 100, "FA-001", "box", "Fischer",
+        {"quantity": "500", "sizes": "3-6mm"}
+    ),
+    (
+        4,
+        i18n("Waterkraan Mixer", "Robinet mitigeur", "Mixer Tap", "Mikser Musluk"),
+        i18n("Moderne keukenkraan", "Robinet de cuisine moderne", "Modern kitchen tap", "Modern mutfak musluğu"),
+        79.99, 20, "PL-001", "piece", "Grohe",
+        {"material": "Chrome", "type": "Single lever"}
+    )
+]
+SEED_PRODUCTS = [
+    (category_index, dict(zip(SEED_PRODUCT_KEYS, values)))
+    for category_index, *values in SEED_PRODUCT_ROWS
+]
+
+SEED_DISCOUNT = {
+    "code": "WELCOME10",
+    "name": i18n("Welkomstkorting", "Réduction de bienvenue", "Welcome Discount", "Hoşgeldin İndirimi"),
+    "description": i18n("10% korting op uw eerste bestelling", "10% de réduction sur votre première commande", "10% off your first order", "İlk siparişinizde %10 indirim"),
+    "discount_type": "percentage",
+    "discount_value": 10,
+    "min_order_amount": 50,
+    "max_uses": 0,
+    "used_count": 0,
+    "is_active": True
+}
+
+def bson_elements(doc: dict) -> bytes:
+    """The BSON elements of doc, without the length prefix and terminator"""
+    return bson_encode(doc)[4:-1]
+
+def raw_bson_document(*elements: bytes) -> RawBSONDocument:
+    """Join BSON element chunks into one document"""
+    body = b"".join(elements)
+    return RawBSONDocument(struct.pack("<i", len(body) + 5) + body + b"\x00")
+
+# The static fields of each seed product, BSON-encoded once at import
+SEED_PRODUCT_ELEMENTS = [
+    (
+        category_index,
+        bson_elements({**template, "images": [], "is_active": True, "search_terms": product_search_terms(template)})
+    )
+    for category_index, template in SEED_PRODUCTS
+]
+
+# Documents per bulk write when seeding
+SEED_BATCH_SIZE = 100
+
+async def seed_insert(collection, docs, batch_size=SEED_BATCH_SIZE):
+    """Insert seed documents in fixed-size unordered bulk writes; returns the number inserted"""
+    collection = collection.with_options(write_concern=SEED_WRITE_CONCERN)
+    inserted = 0
+    for i in range(0, len(docs), batch_size):
+        result = await collection.bulk_write(
+            [InsertOne(doc) for doc in docs[i:i + batch_size]],
+            ordered=False,
+            bypass_document_validation=True
+        )
+        inserted += result.inserted_count
+    return inserted
+
+def build_seed_payload():
+    """Build the seed categories, BSON-encoded products and discount"""
+    # One timestamp for the whole seed batch
+    now = datetime.utcnow()
+    
+    # Draw every seed id from one entropy buffer. Catalog documents reuse the
+    # public id as _id, so the server does not add a second ObjectId identity
+    ids = str_ids(len(SEED_CATEGORIES) + len(SEED_PRODUCTS) + 1)
+    category_ids = ids[:len(SEED_CATEGORIES)]
+    product_ids = ids[len(SEED_CATEGORIES):-1]
+    
+    categories = [
+        {"_id": category_id, "id": category_id, **template, "is_active": True, "created_at": now, "updated_at": now}
+        for category_id, template in zip(category_ids, SEED_CATEGORIES)
+    ]
+    
+    # Products are spliced from BSON: the per-seed ids and timestamps are
+    # encoded here, the static catalog fields come pre-encoded from import
+    timestamps = bson_elements({"created_at": now, "updated_at": now})
+    raw_products = [
+        raw_bson_document(
+            bson_elements({"_id": product_id, "id": product_id, "category_id": category_ids[category_index]}),
+            elements,
+            timestamps
+        )
+        for product_id, (category_index, elements) in zip(product_ids, SEED_PRODUCT_ELEMENTS)
+    ]
+    
+    discount = {"id": ids[-1], **SEED_DISCOUNT, "valid_from": now, "created_at": now}
+    return categories, raw_products, discount
+
 @api_router.post("/seed")
 async def seed_database():
     """Seed database with sample categories and products"""
@@ -987,243 +1447,154 @@ async def seed_database():
     if existing > 0:
         return {"message": "Database already seeded"}
     
-    # Sample categories
-    categories = [
-        {
-            "id": str(uuid.uuid4()),
-            "name": {"nl": "Handgereedschap", "fr": "Outils à main", "en": "Hand Tools", "tr": "El Aletleri"},
-            "description": {"nl": "Alle handgereedschappen", "fr": "Tous les outils à main", "en": "All hand tools", "tr": "Tüm el aletleri"},
-            "is_active": True,
-            "sort_order": 1,
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow()
-        },
-        {
-            "id": str(uuid.uuid4()),
-            "name": {"nl": "Elektrisch gereedschap", "fr": "Outils électriques", "en": "Power Tools", "tr": "Elektrikli Aletler"},
-            "description": {"nl": "Elektrisch gereedschap", "fr": "Outils électriques", "en": "Power tools", "tr": "Elektrikli aletler"},
-            "is_active": True,
-            "sort_order": 2,
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow()
-        },
-        {
-            "id": str(uuid.uuid4()),
-            "name": {"nl": "Verf & Accessoires", "fr": "Peinture & Accessoires", "en": "Paint & Accessories", "tr": "Boya & Aksesuarlar"},
-            "description": {"nl": "Verf en schilderbenodigdheden", "fr": "Peinture et fournitures de peinture", "en": "Paint and painting supplies", "tr": "Boya ve boya malzemeleri"},
-            "is_active": True,
-            "sort_order": 3,
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow()
-        },
-        {
-            "id": str(uuid.uuid4()),
-            "name": {"nl": "Bevestigingsmaterialen", "fr": "Fixations", "en": "Fasteners", "tr": "Bağlantı Elemanları"},
-            "description": {"nl": "Schroeven, bouten en moeren", "fr": "Vis, boulons et écrous", "en": "Screws, bolts and nuts", "tr": "Vidalar, cıvatalar ve somunlar"},
-            "is_active": True,
-            "sort_order": 4,
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow()
-        },
-        {
-            "id": str(uuid.uuid4()),
-            "name": {"nl": "Sanitair", "fr": "Plomberie", "en": "Plumbing", "tr": "Sıhhi Tesisat"},
-            "description": {"nl": "Sanitaire artikelen", "fr": "Articles de plomberie", "en": "Plumbing supplies", "tr": "Sıhhi tesisat malzemeleri"},
-            "is_active": True,
-            "sort_order": 5,
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow()
-        },
-        {
-            "id": str(uuid.uuid4()),
-            "name": {"nl": "Elektriciteit", "fr": "Électricité", "en": "Electrical", "tr": "Elektrik"},
-            "description": {"nl": "Elektrische artikelen", "fr": "Articles électriques", "en": "Electrical supplies", "tr": "Elektrik malzemeleri"},
-            "is_active": True,
-            "sort_order": 6,
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow()
-        }
-    ]
-    
-    await db.categories.insert_many(categories)
-    
-    # Sample products
-    products = [
-        {
-            "id": str(uuid.uuid4()),
-            "name": {"nl": "Professionele Hamer", "fr": "Marteau professionnel", "en": "Professional Hammer", "tr": "Profesyonel Çekiç"},
-            "description": {"nl": "Hoogwaardige stalen hamer", "fr": "Marteau en acier de haute qualité", "en": "High quality steel hammer", "tr": "Yüksek kaliteli çelik çekiç"},
-            "price": 24.99,
-            "stock": 50,
-            "sku": "HT-001",
-            "category_id": categories[0]["id"],
-            "images": [],
-            "is_active": True,
-            "unit": "piece",
-            "brand": "Stanley",
-            "specifications": {"weight": "500g", "material": "Steel"},
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow()
-        },
-        {
-            "id": str(uuid.uuid4()),
-            "name": {"nl": "Schroevendraaierset 12-delig", "fr": "Jeu de tournevis 12 pièces", "en": "Screwdriver Set 12-piece", "tr": "12 Parça Tornavida Seti"},
-            "description": {"nl": "Complete set schroevendraaiers", "fr": "Jeu complet de tournevis", "en": "Complete set of screwdrivers", "tr": "Komple tornavida seti"},
-            "price": 34.99,
-            "stock": 30,
-            "sku": "HT-002",
-            "category_id": categories[0]["id"],
-            "images": [],
-            "is_active": True,
-            "unit": "set",
-            "brand": "Bosch",
-            "specifications": {"pieces": "12", "type": "Various"},
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow()
-        },
-        {
-            "id": str(uuid.uuid4()),
-            "name": {"nl": "Accuboormachine 18V", "fr": "Perceuse sans fil 18V", "en": "Cordless Drill 18V", "tr": "Akülü Matkap 18V"},
-            "description": {"nl": "Krachtige accuboormachine", "fr": "Perceuse sans fil puissante", "en": "Powerful cordless drill", "tr": "Güçlü akülü matkap"},
-            "price": 129.99,
-            "stock": 15,
-            "sku": "PT-001",
-            "category_id": categories[1]["id"],
-            "images": [],
-            "is_active": True,
-            "unit": "piece",
-            "brand": "DeWalt",
-            "specifications": {"voltage": "18V", "battery": "2.0Ah"},
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow()
-        },
-        {
-            "id": str(uuid.uuid4()),
-            "name": {"nl": "Muurverf Wit 10L", "fr": "Peinture murale blanche 10L", "en": "Wall Paint White 10L", "tr": "Duvar Boyası Beyaz 10L"},
-            "description": {"nl": "Witte muurverf voor binnen", "fr": "Peinture murale blanche pour intérieur", "en": "White wall paint for interior", "tr": "İç mekan için beyaz duvar boyası"},
-            "price": 49.99,
-            "stock": 25,
-            "sku": "PA-001",
-            "category_id": categories[2]["id"],
-            "images": [],
-            "is_active": True,
-            "unit": "bucket",
-            "brand": "Levis",
-            "specifications": {"volume": "10L", "coverage": "80m²"},
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow()
-        },
-        {
-            "id": str(uuid.uuid4()),
-            "name": {"nl": "Schroeven Assortiment", "fr": "Assortiment de vis", "en": "Screw Assortment", "tr": "Vida Çeşitleri"},
-            "description": {"nl": "500 schroeven in diverse maten", "fr": "500 vis de différentes tailles", "en": "500 screws in various sizes", "tr": "Çeşitli boyutlarda 500 vida"},
-            "price": 19.99,
-            "stock": 100,
-            "sku": "FA-001",
-            "category_id": categories[3]["id"],
-            "images": [],
-            "is_active": True,
-            "unit": "box",
-            "brand": "Fischer",
-            "specifications": {"quantity": "500", "sizes": "3-6mm"},
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow()
-        },
-        {
-            "id": str(uuid.uuid4()),
-            "name": {"nl": "Waterkraan Mixer", "fr": "Robinet mitigeur", "en": "Mixer Tap", "tr": "Mikser Musluk"},
-            "description": {"nl": "Moderne keukenkraan", "fr": "Robinet de cuisine moderne", "en": "Modern kitchen tap", "tr": "Modern mutfak musluğu"},
-            "price": 79.99,
-            "stock": 20,
-            "sku": "PL-001",
-            "category_id": categories[4]["id"],
-            "images": [],
-            "is_active": True,
-            "unit": "piece",
-            "brand": "Grohe",
-            "specifications": {"material": "Chrome", "type": "Single lever"},
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow()
-        }
-    ]
-    
-    await db.products.insert_many(products)
+    # Building and encoding the payload is CPU-bound, so keep it off the event loop
+    loop = asyncio.get_running_loop()
+    categories, raw_products, discount = await loop.run_in_executor(None, build_seed_payload)
     
-    # Sample discount
-    discount = {
-        "id": str(uuid.uuid4()),
-        "code": "WELCOME10",
-        "name": {"nl": "Welkomstkorting", "fr": "Réduction de bienvenue", "en": "Welcome Discount", "tr": "Hoşgeldin İndirimi"},
-        "description": {"nl": "10% korting op uw eerste bestelling", "fr": "10% de réduction sur votre première commande", "en": "10% off your first order", "tr": "İlk siparişinizde %10 indirim"},
-        "discount_type": "percentage",
-        "discount_value": 10,
-        "min_order_amount": 50,
-        "max_uses": 0,
-        "used_count": 0,
-        "is_active": True,
-        "valid_from": datetime.utcnow(),
-        "created_at": datetime.utcnow()
-    }
+    await seed_insert(db.categories, categories)
+    category_list_cache.clear()
     
-    await db.discounts.insert_one(discount)
+    # Products and the discount are independent, so insert them concurrently
+    products_inserted, _ = await asyncio.gather(
+        seed_insert(db.products, raw_products),
+        seed_insert(db.discounts, [discount]),
+    )
+    await bump_stats(total_products=products_inserted)
     
     # Create superadmin user
-    superadmin_exists = await db.users.find_one({"role": "superadmin"})
-    if not superadmin_exists:
-        superadmin = {
-            "id": str(uuid.uuid4()),
-            "email": "admin@hardwarestore.be",
-            "password_hash": get_password_hash("Admin123!"),
-            "name": "Super Admin",
-            "phone": "+32 XXX XXX XXX",
-            "role": "superadmin",
-            "is_active": True,
-            "created_at": datetime.utcnow()
-        }
-        await db.users.insert_one(superadmin)
+    await ensure_superadmin()
     
     # Create default site settings
     settings_exists = await db.settings.find_one({"id": "site_settings"})
     if not settings_exists:
         default_settings = SiteSettings()
-        await db.settings.insert_one(default_settings.dict())
+        await db.settings.insert_one(default_settings.model_dump())
     
-    return {"message": "Database seeded successfully", "categories": len(categories), "products": len(products), "superadmin_email": "admin@hardwarestore.be", "superadmin_password": "Admin123!"}
+    return {"message": "Database seeded successfully", "categories": len(categories), "products": len(raw_products), "superadmin_email": "admin@hardwarestore.be", "superadmin_password": "Admin123!"}
+
+# Root endpoint; the body is static, so it is serialized and hashed once at import
+ROOT_RESPONSE_BODY = orjson.dumps({"message": "Belgian Hardware Store API", "version": "1.0.0"})
+ROOT_ETAG = '"%s"' % hashlib.sha1(ROOT_RESPONSE_BODY).hexdigest()
+ROOT_CACHE_HEADERS = {"Cache-Control": "public, max-age=3600, immutable", "ETag": ROOT_ETAG}
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against a strong etag"""
+    if not if_none_match:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or etag in tags
 
-# Root endpoint
 @api_router.get("/")
-async def root():
-    return {"message": "Belgian Hardware Store API", "version": "1.0.0"}
+async def root(if_none_match: Optional[str] = Header(None)):
+    if etag_matches(if_none_match, ROOT_ETAG):
+        return Response(status_code=304, headers=ROOT_CACHE_HEADERS)
+    return Response(content=ROOT_RESPONSE_BODY, media_type="application/json", headers=ROOT_CACHE_HEADERS)
 
 # Include the router in the main app
 app.include_router(api_router)
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_credentials=True,
-    allow_origins=["*"],
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
 @app.on_event("startup")
-async def startup_event():
-    """Ensure superadmin exists on startup"""
-    superadmin_exists = await db.users.find_one({"role": "superadmin"})
-    if not superadmin_exists:
-        superadmin = {
-            "id": str(uuid.uuid4()),
-            "email": "admin@hardwarestore.be",
-            "password_hash": get_password_hash("Admin123!"),
+async def startup_db_client():
+    global client, db
+    client = AsyncMongoClient(mongo_url, **MONGO_CLIENT_OPTIONS)
+    db = client[db_name]
+    # Connect eagerly: server selection and the first pooled connections are
+    # set up here instead of on the first API request
+    await client.admin.command("ping")
+
+async def create_unique_index(collection, keys, **kwargs):
+    """Create a unique index, logging instead of failing when existing data has duplicates.
+
+    Databases written before these indexes existed may already hold duplicates
+    (the old check-then-insert writes were racy); they must not keep the API
+    from starting. The duplicates have to be resolved before the index can be built.
+    """
+    try:
+        await collection.create_index(keys, unique=True, **kwargs)
+    except OperationFailure as e:
+        if e.code != 11000:
+            raise
+        logger.warning("Duplicate %s in %s; unique index not created: %s", keys, collection.name, e)
+
+async def create_indexes():
+    """Create indexes for the fields used in lookups, filters and sorts"""
+    await asyncio.gather(
+        create_unique_index(db.products, "id"),
+        db.products.create_index("category_id"),
+        # SKUs are unique when set; products without one stay out of the index
+        create_unique_index(db.products, "sku", name="sku_unique", partialFilterExpression={"sku": {"$gt": ""}}),
+        db.products.create_index("search_terms"),
+        db.products.create_index("stock"),
+        # Text index backing product search; no stemming since names are multilingual
+        db.products.create_index(
+            [("name.nl", "text"), ("name.fr", "text"), ("name.en", "text"),
+             ("name.tr", "text"), ("sku", "text"), ("brand", "text")],
+            name="product_search",
+            default_language="none"
+        ),
+        create_unique_index(db.categories, "id"),
+        create_unique_index(db.orders, "id"),
+        db.orders.create_index("order_number"),
+        db.orders.create_index([("created_at", -1)]),
+        db.orders.create_index("status"),
+        create_unique_index(db.customers, "id"),
+        create_unique_index(db.customers, "email"),
+        create_unique_index(db.discounts, "code"),
+        create_unique_index(db.users, "id"),
+        create_unique_index(db.users, "email"),
+    )
+
+async def backfill_search_terms():
+    """Add search_terms to products created before prefix search existed"""
+    missing = await db.products.find(
+        {"search_terms": {"$exists": False}}, {"_id": 0, "id": 1, "name": 1, "sku": 1, "brand": 1}
+    ).to_list(None)
+    if missing:
+        await db.products.bulk_write([
+            UpdateOne({"id": p["id"]}, {"$set": {"search_terms": product_search_terms(p)}})
+            for p in missing
+        ], ordered=False)
+
+async def ensure_superadmin():
+    """Create the default superadmin unless one exists; returns True if it was created.
+
+    The insert is an upsert on the unique email, so several workers booting
+    at once create the user exactly once instead of failing on the index.
+    """
+    if await db.users.find_one({"role": "superadmin"}, {"_id": 1}):
+        return False
+    loop = asyncio.get_running_loop()
+    password_hash = await loop.run_in_executor(None, get_password_hash, "Admin123!")
+    result = await db.users.update_one(
+        {"email": "admin@hardwarestore.be"},
+        {"$setOnInsert": {
+            "id": str_id(),
+            "password_hash": password_hash,
             "name": "Super Admin",
             "phone": "+32 XXX XXX XXX",
             "role": "superadmin",
             "is_active": True,
             "created_at": datetime.utcnow()
-        }
-        await db.users.insert_one(superadmin)
+        }},
+        upsert=True
+    )
+    return result.upserted_id is not None
+
+@app.on_event("startup")
+async def startup_event():
+    """Create indexes and ensure superadmin exists on startup"""
+    await create_indexes()
+    await backfill_search_terms()
+    
+    if await ensure_superadmin():
         logger.info("Superadmin user created: admin@hardwarestore.be")
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
+    await client.close()
+
+if __name__ == "__main__":
+    # uvicorn's default "auto" loop and http settings pick uvloop and httptools
+    # when the [standard] extras provide them
+    import uvicorn
+    uvicorn.run(app, host="0.0.0.0", port=int(os.environ.get("PORT", "8001")))
@@ -18,7 +18,7 @@ import {
 import { Ionicons } from '@expo/vector-icons';
 import * as ImagePicker from 'expo-image-picker';
 import { useStore } from '../../src/store/useStore';
-import { getProducts, createProduct, updateProduct, deleteProduct, getCategories } from '../../src/services/api';
+import { getProducts, getProduct, createProduct, updateProduct, deleteProduct, getCategories } from '../../src/services/api';
 import { Product, Category, MultilingualText } from '../../src/types';
 
 export default function AdminProductsScreen() {
@@ -85,20 +85,26 @@ export default function AdminProductsScreen() {
     setModalVisible(true);
   };
 
-  const openEditModal = (product: Product) => {
-    setEditingProduct(product);
-    setFormData({
-      name: product.name,
-      description: product.description,
-      price: product.price.toString(),
-      stock: product.stock.toString(),
-      sku: product.sku,
-      category_id: product.category_id,
-      brand: product.brand,
-      unit: product.unit,
-    });
-    setProductImages(product.images || []);
-    setModalVisible(true);
+  const openEditModal = async (listItem: Product) => {
+    // The product list only carries a thumbnail, so load the full product before editing
+    try {
+      const product = await getProduct(listItem.id);
+      setEditingProduct(product);
+      setFormData({
+        name: product.name,
+        description: product.description,
+        price: product.price.toString(),
+        stock: product.stock.toString(),
+        sku: product.sku,
+        category_id: product.category_id,
+        brand: product.brand,
+        unit: product.unit,
+      });
+      setProductImages(product.images || []);
+      setModalVisible(true);
+    } catch (error: any) {
+      Alert.alert('Error', error.response?.data?.detail || 'Failed to load product');
+    }
   };
 
   // Image Picker Functions
@@ -0,0 +1,340 @@
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import pytest
+from bson import decode
+from pymongo.errors import BulkWriteError, OperationFailure
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import server  # noqa: E402
+
+
+def bson_millis(dt):
+    """BSON dates keep millisecond precision"""
+    return dt.replace(microsecond=dt.microsecond // 1000 * 1000)
+
+
+def test_seed_products_decode_to_expected_documents():
+    categories, raw_products, discount = server.build_seed_payload()
+    now = categories[0]["created_at"]
+
+    assert len(raw_products) == len(server.SEED_PRODUCTS)
+    for raw, (category_index, template) in zip(raw_products, server.SEED_PRODUCTS):
+        assert int.from_bytes(raw.raw[:4], "little") == len(raw.raw)
+        doc = decode(raw.raw)
+        expected = {
+            "_id": doc["id"],
+            "id": doc["id"],
+            **template,
+            "category_id": categories[category_index]["id"],
+            "images": [],
+            "is_active": True,
+            "created_at": bson_millis(now),
+            "updated_at": bson_millis(now),
+        }
+        expected["search_terms"] = server.product_search_terms(expected)
+        assert doc == expected
+
+
+def test_seed_ids_are_unique():
+    categories, raw_products, discount = server.build_seed_payload()
+    ids = [c["id"] for c in categories] + [decode(p.raw)["id"] for p in raw_products] + [discount["id"]]
+    assert len(set(ids)) == len(ids)
+
+
+@pytest.mark.parametrize("before, kwargs, expected", [
+    ({"status": "pending"}, {"status": "confirmed"}, {"pending_orders": -1}),
+    ({"status": "confirmed"}, {"status": "pending"}, {"pending_orders": 1}),
+    ({"status": "confirmed"}, {"status": "shipped"}, {"pending_orders": 0}),
+    ({"payment_status": "pending", "total": 50}, {"payment_status": "paid"}, {"total_revenue": 50}),
+    ({"payment_status": "paid", "total": 50}, {"payment_status": "paid"}, {"total_revenue": 0}),
+    ({"payment_status": "paid", "total": 50}, {"payment_status": "refunded"}, {"total_revenue": -50}),
+    (
+        {"status": "pending", "payment_status": "pending", "total": 20},
+        {"status": "confirmed", "payment_status": "paid"},
+        {"pending_orders": -1, "total_revenue": 20},
+    ),
+])
+def test_order_stats_deltas(before, kwargs, expected):
+    assert server.order_stats_deltas(before, **kwargs) == expected
+
+
+@pytest.mark.parametrize("fields, expected", [
+    (None, server.PRODUCT_LIST_PROJECTION),
+    ("", server.PRODUCT_LIST_PROJECTION),
+    ("name, price", {"_id": 0, "id": 1, "name": 1, "price": 1}),
+    ("_id", {"_id": 0, "id": 1}),
+    ("name,name.en", {"_id": 0, "id": 1, "name": 1}),
+    ("$where,search_terms,unknown", {"_id": 0, "id": 1}),
+])
+def test_list_projection_whitelists_model_fields(fields, expected):
+    assert server.list_projection(fields, server.PRODUCT_LIST_PROJECTION, server.PRODUCT_FIELDS) == expected
+
+
+def test_category_fields_exclude_internal_names():
+    assert "_id" not in server.CATEGORY_FIELDS
+    assert {"id", "name", "image"} <= server.CATEGORY_FIELDS
+
+
+@pytest.mark.parametrize("product, terms", [
+    ({"name": {"en": "Claw Hammer"}, "sku": "HM-001", "brand": "Stanley"}, ["001", "claw", "hammer", "hm", "hm-001", "stanley"]),
+    ({"name": {"nl": "Schroef", "en": "Screw"}, "sku": "", "brand": ""}, ["schroef", "screw"]),
+    ({"name": {"en": "12-piece Set"}, "sku": "", "brand": ""}, ["12", "piece", "set"]),
+    ({"name": {"tr": "Çekiç"}}, ["çekiç"]),
+])
+def test_product_search_terms(product, terms):
+    assert server.product_search_terms(product) == terms
+
+
+def test_product_search_query_plain_word():
+    assert server.product_search_query(" Hammer ") == {"search_terms": {"$regex": "^hammer"}}
+
+
+@pytest.mark.parametrize("search, whole, tokens", [
+    ("12-piece", "12\\-piece", ["12", "piece"]),
+    ("HM-001", "hm\\-001", ["hm", "001"]),
+])
+def test_product_search_query_punctuated_word(search, whole, tokens):
+    assert server.product_search_query(search) == {"$or": [
+        {"search_terms": {"$regex": f"^{whole}"}},
+        {"$and": [{"search_terms": {"$regex": f"^{token}"}} for token in tokens]},
+    ]}
+
+
+def test_product_search_query_punctuation_only():
+    assert server.product_search_query("---") == {"search_terms": {"$regex": "^\\-\\-\\-"}}
+
+
+@pytest.mark.parametrize("search", ["claw hammer", "Claw  Hammer HM-001"])
+def test_product_search_query_multiple_words_use_text_search(search):
+    assert server.product_search_query(search) == {"$text": {"$search": search}}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(server.time, "monotonic", clock)
+    return clock
+
+
+def test_ttl_cache_entries_expire(clock):
+    cache = server.TTLCache(maxsize=4, ttl=5)
+    cache.set("a", 1)
+    clock.now += 5
+    assert cache.get("a") == 1
+    clock.now += 0.1
+    assert cache.get("a") is None
+    assert "a" not in cache._data
+
+
+def test_ttl_cache_set_refreshes_expiry(clock):
+    cache = server.TTLCache(maxsize=4, ttl=5)
+    cache.set("a", 1)
+    clock.now += 4
+    cache.set("a", 2)
+    clock.now += 4
+    assert cache.get("a") == 2
+
+
+def test_ttl_cache_evicts_least_recently_used(clock):
+    cache = server.TTLCache(maxsize=2, ttl=5)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now the least recently used
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_ttl_cache_invalidate_and_clear(clock):
+    cache = server.TTLCache(maxsize=4, ttl=5)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.invalidate("a")
+    cache.invalidate("missing")
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    cache.clear()
+    assert cache.get("b") is None
+
+
+def test_invalidate_order_drops_both_keys(monkeypatch):
+    cache = server.TTLCache(maxsize=4, ttl=5)
+    monkeypatch.setattr(server, "order_cache", cache)
+    order = {"id": "abc", "order_number": "ORD-20240101-ABCD1234"}
+    cache.set(order["id"], order)
+    cache.set(order["order_number"], order)
+    cache.set("other", {"id": "other"})
+    server.invalidate_order(order)
+    assert cache.get("abc") is None
+    assert cache.get("ORD-20240101-ABCD1234") is None
+    assert cache.get("other") == {"id": "other"}
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def to_list(self, length):
+        return self.docs[:length]
+
+
+class FakeCountCollection:
+    def __init__(self, counts, aggregate_result=()):
+        self.counts = counts
+        self.aggregate_result = list(aggregate_result)
+
+    async def count_documents(self, query):
+        return self.counts[tuple(sorted(query.items()))]
+
+    async def aggregate(self, pipeline):
+        return FakeCursor(self.aggregate_result)
+
+
+class FakeStatsCollection:
+    def __init__(self):
+        self.doc = None
+
+    async def find_one(self, query):
+        return self.doc
+
+    async def replace_one(self, query, doc, upsert=False):
+        self.doc = {"_id": query["_id"], **doc}
+
+    async def update_one(self, query, update):
+        if self.doc is not None:
+            for key, delta in update["$inc"].items():
+                self.doc[key] = self.doc.get(key, 0) + delta
+
+
+class FakeStatsDatabase:
+    def __init__(self, revenue):
+        self.products = FakeCountCollection({(): 7})
+        self.orders = FakeCountCollection({(): 4, (("status", "pending"),): 3}, revenue)
+        self.customers = FakeCountCollection({(): 2})
+        self.stats = FakeStatsCollection()
+
+
+@pytest.mark.parametrize("revenue, total_revenue", [([{"_id": None, "total": 121.5}], 121.5), ([], 0)])
+def test_recompute_stats_rebuilds_counters(monkeypatch, revenue, total_revenue):
+    fake_db = FakeStatsDatabase(revenue)
+    monkeypatch.setattr(server, "db", fake_db)
+    expected = {
+        "total_products": 7,
+        "total_orders": 4,
+        "total_customers": 2,
+        "pending_orders": 3,
+        "total_revenue": total_revenue,
+    }
+    assert asyncio.run(server.recompute_stats()) == expected
+    assert fake_db.stats.doc == {"_id": server.STATS_ID, **expected}
+
+
+def test_get_stats_rebuilds_missing_document_then_bumps_apply(monkeypatch):
+    fake_db = FakeStatsDatabase([])
+    monkeypatch.setattr(server, "db", fake_db)
+
+    async def scenario():
+        assert (await server.get_stats())["total_orders"] == 4
+        await server.bump_stats(total_orders=1, pending_orders=1, total_customers=0)
+        return await server.get_stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["total_orders"] == 5
+    assert stats["pending_orders"] == 4
+    assert stats["total_customers"] == 2
+
+
+def test_bump_stats_without_document_is_noop(monkeypatch):
+    fake_db = FakeStatsDatabase([])
+    monkeypatch.setattr(server, "db", fake_db)
+    asyncio.run(server.bump_stats(total_orders=1))
+    assert fake_db.stats.doc is None
+
+
+class FakeCollection:
+    def __init__(self, error=None):
+        self.batches = []
+        self.error = error
+
+    def with_options(self, **kwargs):
+        return self
+
+    async def bulk_write(self, requests, **kwargs):
+        if self.error:
+            raise self.error
+        self.batches.append(len(requests))
+
+        class Result:
+            inserted_count = len(requests)
+        return Result()
+
+
+def test_seed_insert_batches_documents():
+    collection = FakeCollection()
+    inserted = asyncio.run(server.seed_insert(collection, [{"n": i} for i in range(5)], batch_size=2))
+    assert inserted == 5
+    assert collection.batches == [2, 2, 1]
+
+
+def test_seed_insert_reports_write_errors():
+    error = BulkWriteError({"writeErrors": [{"index": 0, "code": 11000}], "nInserted": 0})
+    with pytest.raises(BulkWriteError):
+        asyncio.run(server.seed_insert(FakeCollection(error), [{"n": 0}]))
+
+
+class FakeIndexCollection:
+    name = "users"
+
+    def __init__(self, error=None):
+        self.error = error
+        self.indexes = []
+
+    async def create_index(self, keys, **kwargs):
+        if self.error:
+            raise self.error
+        self.indexes.append((keys, kwargs))
+
+
+def test_create_unique_index():
+    collection = FakeIndexCollection()
+    asyncio.run(server.create_unique_index(collection, "email"))
+    assert collection.indexes == [("email", {"unique": True})]
+
+
+def test_create_unique_index_tolerates_existing_duplicates(caplog):
+    collection = FakeIndexCollection(OperationFailure("E11000 duplicate key error", code=11000))
+    asyncio.run(server.create_unique_index(collection, "email"))
+    assert "unique index not created" in caplog.text
+
+
+def test_create_unique_index_raises_other_failures():
+    collection = FakeIndexCollection(OperationFailure("not authorized", code=13))
+    with pytest.raises(OperationFailure):
+        asyncio.run(server.create_unique_index(collection, "email"))
+
+
+@pytest.mark.parametrize("header, matches", [
+    (None, False),
+    ("", False),
+    (server.ROOT_ETAG, True),
+    ("W/" + server.ROOT_ETAG, True),
+    ('"other", ' + server.ROOT_ETAG, True),
+    ("*", True),
+    ('"other"', False),
+])
+def test_root_etag_matches(header, matches):
+    assert server.etag_matches(header, server.ROOT_ETAG) is matches